@@ -3,48 +3,62 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import inspect
+import itertools
 import json
 import logging
+import os
 import re
-import subprocess
+import secrets
+import string
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Annotated, Any, AsyncIterator, Final, cast
-from uuid import uuid4
+from typing import Annotated, Any, AsyncIterator, Callable, Final, cast
+from urllib.parse import urlparse, urlunparse
 
-import boto3
-from agents import Agent, RunContextWrapper, Runner, function_tool
+from agents import Agent, ModelSettings, RunContextWrapper, Runner, function_tool
 from chatkit.agents import (
     AgentContext,
     ClientToolCall,
     ThreadItemConverter,
     stream_agent_response,
 )
-from chatkit.server import ChatKitServer, ThreadItemDoneEvent
+from chatkit.server import ChatKitServer
 from chatkit.types import (
+    AssistantMessageContentPartTextDelta,
     ClientToolCallItem,
     HiddenContextItem,
     ImageAttachment,
+    ThreadItemUpdatedEvent,
     ThreadMetadata,
     UserMessageItem,
 )
 from openai.types.responses import ResponseInputContentParam
 from openai.types.responses.response_input_image_param import ResponseInputImageParam
+from py_mini_racer import JSEvalException, MiniRacer
 from pydantic import AnyUrl, ConfigDict, Field
 
 from .constants import INSTRUCTIONS, MODEL
 from .neon_store import NeonStore
-from .traccar import invoke, _get_session_id, _get_traccar_url, fleetmap_url
+from .traccar import invoke_cached, get_session, _get_session_id, _get_traccar_url, fleetmap_url
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 logger = logging.getLogger(__name__)
 
 SUPPORTED_COLOR_SCHEMES: Final[frozenset[str]] = frozenset({"light", "dark"})
 CLIENT_THEME_TOOL_NAME: Final[str] = "switch_theme"
 REPORTS_DIR: Final[Path] = Path(__file__).parent.parent / "reports"
+REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+_OPENAPI_YAML: Final[str] = (Path(__file__).parent / "openapi.yaml").read_text(encoding="utf-8")
 # Pending screenshot tasks keyed by filename, so requests can await them
 screenshot_tasks: dict[str, asyncio.Task] = {}
+# Shared headless Chromium for screenshots, launched on first use
+_playwright: Any | None = None
+_browser: Any | None = None
+_browser_lock = asyncio.Lock()
+# Fire-and-forget writes, referenced until done so they aren't garbage collected
+_background_tasks: set[asyncio.Task] = set()
 
 
 def _normalize_color_scheme(value: str) -> str:
@@ -58,38 +72,79 @@ def _normalize_color_scheme(value: str) -> str:
     raise ValueError("Theme must be either 'light' or 'dark'.")
 
 
+def _run_in_background(coro: Any) -> None:
+    """Schedule a write nothing in this turn reads back, logging it if it fails."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_on_background_task_done)
+
+
+def _on_background_task_done(task: asyncio.Task) -> None:
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Background task failed", exc_info=task.exception())
+
+
+async def drain_background_tasks() -> None:
+    """Wait for pending background writes, e.g. before shutdown closes the pool."""
+    if _background_tasks:
+        await asyncio.gather(*_background_tasks, return_exceptions=True)
+
+
 def _gen_id(prefix: str) -> str:
-    return f"{prefix}_{uuid4().hex[:8]}"
+    return f"{prefix}_{secrets.token_hex(4)}"
+
+
+_SCRIPT_OPEN_TAG: Final[re.Pattern[str]] = re.compile(r"<script", re.IGNORECASE)
+_SCRIPT_PATTERN: Final[re.Pattern[str]] = re.compile(
+    r"<script[^>]*>(.*?)</script>", re.DOTALL | re.IGNORECASE
+)
 
 
 def _validate_js_syntax(html: str) -> str | None:
-    logger.info("_validate_js_syntax")
     """Extract and validate JavaScript syntax from HTML. Returns error message or None if valid."""
-    script_pattern = re.compile(r"<script[^>]*>(.*?)</script>", re.DOTALL | re.IGNORECASE)
-    scripts = script_pattern.findall(html)
+    if _SCRIPT_OPEN_TAG.search(html) is None:
+        return None
+    scripts = _SCRIPT_PATTERN.findall(html)
 
     if not scripts:
         return None
 
+    ctx = MiniRacer()
     for i, script in enumerate(scripts):
         script = script.strip()
         if not script:
             continue
-        # Use Node.js to check syntax (new Function parses but doesn't execute)
-        result = subprocess.run(
-            ["node", "-e", f"new Function({repr(script)})"],
-            capture_output=True,
-            text=True,
-            timeout=5,
-        )
-        if result.returncode != 0:
-            error = result.stderr.strip()
-            return f"JavaScript syntax error in script block {i + 1}: {error}"
-    logger.info("syntax ok")
+        # Check syntax in an embedded V8 (new Function parses but doesn't execute)
+        try:
+            ctx.eval(f"new Function({json.dumps(script)})")
+        except JSEvalException as e:
+            return f"JavaScript syntax error in script block {i + 1}: {e}"
+    logger.debug("syntax ok")
     return None
 
 
-def _save_html_file(html: str, email: str, cookie: str | None = None, traccar_url: str = "http://gps.frotaweb.com") -> str:
+class _SafeFilenameTable(dict[int, str]):
+    """str.translate table keeping [A-Za-z0-9._-] and mapping every other character to "_"."""
+
+    def __missing__(self, key: int) -> str:
+        return "_"
+
+
+_SAFE_FILENAME_TABLE: Final[_SafeFilenameTable] = _SafeFilenameTable(
+    {ord(c): c for c in string.ascii_letters + string.digits + "._-"}
+)
+
+
+def _write_text(file_path: Path, text: str) -> None:
+    # Encode once and write the bytes in one call, bypassing the TextIOWrapper layer
+    file_path.write_bytes(text.encode("utf-8"))
+
+
+_REPORT_COUNTER = itertools.count()
+
+
+async def _save_html_file(html: str, email: str | None, cookie: str | None = None, traccar_url: str = "http://gps.frotaweb.com") -> str:
     """Save HTML to a file and return the public URL (no DB write).
 
     When *session* is provided it is embedded as a subdomain so the server
@@ -97,18 +152,17 @@ def _save_html_file(html: str, email: str, cookie: str | None = None, traccar_ur
     the rendered page, e.g.
         https://{session}.chat.frotaweb.com/chatkit/{filename}
     """
-    REPORTS_DIR.mkdir(exist_ok=True)
-
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    safe_email = re.sub(r"[^a-zA-Z0-9._-]", "_", email or "unknown")
-    filename = f"{timestamp}_{safe_email}.html"
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    safe_email = (email or "unknown").translate(_SAFE_FILENAME_TABLE)
+    # Counter keeps same-second reports from overwriting each other. The pid is read here,
+    # not at import: forked workers share the reports directory and the counter's start.
+    filename = f"{timestamp}_{safe_email}_{os.getpid():x}_{next(_REPORT_COUNTER):x}.html"
     file_path = REPORTS_DIR / filename
 
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(html)
+    # Only the disk write leaves the event loop
+    await asyncio.to_thread(_write_text, file_path, html)
 
     # Insert session as a subdomain: https://host -> https://{session}.host
-    from urllib.parse import urlparse, urlunparse
     if traccar_url == fleetmap_url:
         base_domain = "https://i8ttracker.com.br"
     else:
@@ -121,27 +175,91 @@ def _save_html_file(html: str, email: str, cookie: str | None = None, traccar_ur
     return url
 
 
+@functools.cache
+def _get_ses_client() -> Any:
+    """Build the SES client on first use; boto3 and its service model are slow to load."""
+    import boto3
+
+    return boto3.client("ses", region_name="eu-west-1")
+
+
+def _send_email(**kwargs: Any) -> Any:
+    """Send via SES. Call it in a worker thread, so the first-use client build stays off the loop."""
+    return _get_ses_client().send_email(**kwargs)
+
+
+async def _get_browser() -> Any:
+    """Return the shared Chromium instance, relaunching it if it went away."""
+    global _playwright, _browser
+    async with _browser_lock:
+        if _browser is None or not _browser.is_connected():
+            from playwright.async_api import async_playwright
+
+            if _playwright is None:
+                _playwright = await async_playwright().start()
+            _browser = await _playwright.chromium.launch()
+    return _browser
+
+
+async def close_browser() -> None:
+    """Close the shared Chromium and stop the Playwright driver, after pending screenshots."""
+    global _playwright, _browser
+    if screenshot_tasks:
+        await asyncio.gather(*screenshot_tasks.values(), return_exceptions=True)
+    async with _browser_lock:
+        if _browser is not None:
+            await _browser.close()
+            _browser = None
+        if _playwright is not None:
+            await _playwright.stop()
+            _playwright = None
+
+
 def _is_tool_completion_item(item: Any) -> bool:
     return isinstance(item, ClientToolCallItem)
 
 
-def _thread_item_done(thread_id: str, item: Any) -> Any:
-    if ThreadItemDoneEvent is None:
-        raise RuntimeError("ThreadItemDoneEvent type is unavailable")
+TEXT_DELTA_BATCH_SIZE: Final[int] = 4
 
-    attempts: tuple[dict[str, Any], ...] = (
-        {"thread_id": thread_id, "item": item},
-        {"threadId": thread_id, "item": item},
-        {"item": item},
-    )
 
-    for kwargs in attempts:
-        try:
-            return ThreadItemDoneEvent(**kwargs)
-        except TypeError:
-            continue
+async def _merge_text_deltas(
+    events: AsyncIterator[Any], max_batch: int = TEXT_DELTA_BATCH_SIZE
+) -> AsyncIterator[Any]:
+    """Merge runs of text deltas for the same content part into a single event.
+
+    Any other event flushes the pending text first, so ordering is preserved and
+    tool calls or item completions are never delayed.
+    """
+    item_id: str | None = None
+    content_index = 0
+    parts: list[str] = []
 
-    return ThreadItemDoneEvent(item=item)
+    def flush() -> ThreadItemUpdatedEvent:
+        event = ThreadItemUpdatedEvent(
+            item_id=cast(str, item_id),
+            update=AssistantMessageContentPartTextDelta(
+                content_index=content_index, delta="".join(parts)
+            ),
+        )
+        parts.clear()
+        return event
+
+    async for event in events:
+        update = event.update if isinstance(event, ThreadItemUpdatedEvent) else None
+        if isinstance(update, AssistantMessageContentPartTextDelta):
+            if parts and (event.item_id != item_id or update.content_index != content_index):
+                yield flush()
+            item_id = event.item_id
+            content_index = update.content_index
+            parts.append(update.delta)
+            if len(parts) >= max_batch:
+                yield flush()
+            continue
+        if parts:
+            yield flush()
+        yield event
+    if parts:
+        yield flush()
 
 
 class TraccarThreadItemConverter(ThreadItemConverter):
@@ -159,34 +277,78 @@ class TraccarThreadItemConverter(ThreadItemConverter):
         raise NotImplementedError(f"Unsupported attachment type: {attachment.type}")
 
 
+# Converter method names to probe, in order of preference
+_CONVERTER_METHOD_NAMES: Final[tuple[str, ...]] = (
+    "to_agent_input",
+    "to_input_item",
+    "convert",
+    "convert_item",
+    "convert_thread_item",
+)
+_VARIADIC_KINDS: Final = (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD)
+_POSITIONAL_KINDS: Final = (
+    inspect.Parameter.POSITIONAL_ONLY,
+    inspect.Parameter.POSITIONAL_OR_KEYWORD,
+)
+
+
+def _resolve_converter_call(converter: Any | None) -> Callable[[Any, Any], Any] | None:
+    """Work out once how to call the converter, so each message skips the reflection."""
+    if converter is None:
+        return None
+    for attr in _CONVERTER_METHOD_NAMES:
+        method = getattr(converter, attr, None)
+        if method is None:
+            continue
+        try:
+            signature = inspect.signature(method)
+        except (TypeError, ValueError):
+            signature = None
+
+        if signature is not None:
+            params = [
+                parameter
+                for parameter in signature.parameters.values()
+                if parameter.kind not in _VARIADIC_KINDS
+            ]
+            if len(params) >= 2:
+                next_param = params[1]
+                if next_param.kind in _POSITIONAL_KINDS:
+                    return lambda item, thread: method(item, thread)
+                name = next_param.name
+                return lambda item, thread: method(item, **{name: thread})
+
+        return lambda item, thread: method(item)
+    return None
+
+
 class TraccarAgentContext(AgentContext):
     model_config = ConfigDict(arbitrary_types_allowed=True)
     store: Annotated[NeonStore, Field(exclude=True)]
     request_context: dict[str, Any]
 
+    @functools.cached_property
+    def request(self) -> Any:
+        """The incoming HTTP request, looked up once per turn."""
+        return self.request_context.get("request")
+
 
 def _user_message_text(item: UserMessageItem) -> str:
-    parts: list[str] = []
-    for part in item.content:
-        text = getattr(part, "text", None)
-        if text:
-            parts.append(text)
-    return " ".join(parts).strip()
+    content = item.content
+    if len(content) == 1:
+        # Common case: a single text part, no join needed
+        text = getattr(content[0], "text", None)
+        return text.strip() if text else ""
+    return " ".join(text for part in content if (text := getattr(part, "text", None))).strip()
 
 
 class TraccarAssistantServer(ChatKitServer[dict[str, Any]]):
     def __init__(self) -> None:
         self.store: NeonStore = NeonStore()
         super().__init__(self.store)
-        tools = [
-            invoke_api,
-            show_html,
-            get_openapi_yaml,
-        ]
-        self.assistant = Agent[TraccarAgentContext](
-            model=MODEL, name="Traccar Assistant", instructions=INSTRUCTIONS, tools=cast(Any, tools)
-        )
+        self.assistant = ASSISTANT_AGENT
         self._thread_item_converter = self._init_thread_item_converter()
+        self._converter_call = _resolve_converter_call(self._thread_item_converter)
 
     async def respond(
         self,
@@ -194,25 +356,16 @@ class TraccarAssistantServer(ChatKitServer[dict[str, Any]]):
         item: UserMessageItem | None,
         context: dict[str, Any],
     ) -> AsyncIterator[Any]:
-        agent_context = TraccarAgentContext(
-            thread=thread,
-            store=self.store,
-            request_context=context,
-        )
-
         target_item = item
         if target_item is None:
             target_item = await self._latest_thread_item(thread, context)
 
-        logger.info("respond: item=%s target_item=%s type=%s", type(item).__name__ if item else None, type(target_item).__name__ if target_item else None, getattr(target_item, "type", None))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("respond: item=%s target_item=%s type=%s", type(item).__name__ if item else None, type(target_item).__name__ if target_item else None, getattr(target_item, "type", None))
 
         if target_item is None:
             return
 
-        metadata = dict(getattr(thread, "metadata", {}) or {})
-        previous_response_id = metadata.get("previous_response_id")
-        agent_context.previous_response_id = previous_response_id
-
         if _is_tool_completion_item(target_item):
             return
 
@@ -220,20 +373,31 @@ class TraccarAssistantServer(ChatKitServer[dict[str, Any]]):
         if agent_input is None:
             return
 
+        # Only built once we know the agent will run
+        previous_response_id = (thread.metadata or {}).get("previous_response_id")
+        agent_context = TraccarAgentContext(
+            thread=thread,
+            store=self.store,
+            request_context=context,
+            previous_response_id=previous_response_id,
+        )
+
         result = Runner.run_streamed(
             self.assistant,
             agent_input,
             context=agent_context,
             previous_response_id=previous_response_id,
         )
-        async for event in stream_agent_response(agent_context, result):
+        async for event in _merge_text_deltas(stream_agent_response(agent_context, result)):
             yield event
 
         response_identifier = getattr(result, "last_response_id", None)
-        if response_identifier is not None:
-            metadata["previous_response_id"] = response_identifier
-            thread.metadata = metadata
-            await self.store.save_thread(thread, context)
+        if response_identifier is not None and response_identifier != previous_response_id:
+            # ChatKit persists the thread once respond() returns, since it changed
+            thread.metadata = {
+                **(thread.metadata or {}),
+                "previous_response_id": response_identifier,
+            }
 
         return
 
@@ -258,52 +422,13 @@ class TraccarAssistantServer(ChatKitServer[dict[str, Any]]):
         thread: ThreadMetadata,
         item: Any,
     ) -> Any | None:
-        if _is_tool_completion_item(item):
-            return None
-
-        converter = getattr(self, "_thread_item_converter", None)
-        if converter is not None:
-            for attr in (
-                "to_agent_input",
-                "to_input_item",
-                "convert",
-                "convert_item",
-                "convert_thread_item",
-            ):
-                method = getattr(converter, attr, None)
-                if method is None:
-                    continue
-                call_args: list[Any] = [item]
-                call_kwargs: dict[str, Any] = {}
-                try:
-                    signature = inspect.signature(method)
-                except (TypeError, ValueError):
-                    signature = None
-
-                if signature is not None:
-                    params = [
-                        parameter
-                        for parameter in signature.parameters.values()
-                        if parameter.kind
-                        not in (
-                            inspect.Parameter.VAR_POSITIONAL,
-                            inspect.Parameter.VAR_KEYWORD,
-                        )
-                    ]
-                    if len(params) >= 2:
-                        next_param = params[1]
-                        if next_param.kind in (
-                            inspect.Parameter.POSITIONAL_ONLY,
-                            inspect.Parameter.POSITIONAL_OR_KEYWORD,
-                        ):
-                            call_args.append(thread)
-                        else:
-                            call_kwargs[next_param.name] = thread
-
-                result = method(*call_args, **call_kwargs)
-                if inspect.isawaitable(result):
-                    return await result
-                return result
+        # respond() has already returned for tool completion items
+        converter_call = self._converter_call
+        if converter_call is not None:
+            result = converter_call(item, thread)
+            if inspect.isawaitable(result):
+                return await result
+            return result
 
         if isinstance(item, UserMessageItem):
             return _user_message_text(item)
@@ -328,12 +453,33 @@ class TraccarAssistantServer(ChatKitServer[dict[str, Any]]):
         )
 
 
+_server: TraccarAssistantServer | None = None
+
+
 def create_chatkit_server() -> TraccarAssistantServer | None:
-    """Return a configured ChatKit server instance if dependencies are available."""
-    return TraccarAssistantServer()
+    """Return the process-wide ChatKit server, building it on first use."""
+    global _server
+    if _server is None:
+        _server = TraccarAssistantServer()
+    return _server
 
 
 MAX_RESPONSE_SIZE: Final[int] = 548576
+# Bulky fields the model never needs, e.g. the undecoded device frame on positions
+_HEAVY_KEYS: Final[tuple[str, ...]] = ("raw",)
+
+
+def _strip_heavy_fields(result: Any) -> None:
+    """Drop heavy fields from Traccar objects in place, at top level and in attributes."""
+    rows = result if isinstance(result, list) else (result,)
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        attributes = row.get("attributes")
+        for key in _HEAVY_KEYS:
+            row.pop(key, None)
+            if isinstance(attributes, dict):
+                attributes.pop(key, None)
 
 
 @function_tool(description_override="invoke traccar api")
@@ -343,30 +489,25 @@ async def invoke_api(
         path: str,
         body: str,
 ):
-    result = invoke(
-        method,
-        path,
-        body,
-        ctx.context.request_context.get("request"),
-    )
-    response_size = len(json.dumps(result))
-    logger.info("invoke_api response size: %d bytes", response_size)
+    result = await invoke_cached(method, path, body, ctx.context.request_context)
+    _strip_heavy_fields(result)
+    # The agents SDK hands the model str(result), so size that text and return it as-is
+    output = str(result)
+    response_size = len(output)
+    logger.info("invoke_api response size: %d chars", response_size)
     if response_size > MAX_RESPONSE_SIZE:
-        logger.warning("Response too large: %d bytes, limit: %d", response_size, MAX_RESPONSE_SIZE)
+        logger.warning("Response too large: %d chars, limit: %d", response_size, MAX_RESPONSE_SIZE)
         return {
-            "error": f"Response too large ({response_size} bytes). "
+            "error": f"Response too large ({response_size} characters). "
             "Fetch this data client-side in your HTML using JavaScript fetch() instead."
         }
-    return result
+    return output
 
 
-def _get_user_email_from_traccar(context: dict[str, Any]) -> str | None:
+async def _get_user_email_from_traccar(context: dict[str, Any]) -> str | None:
     """Get user email from Traccar session."""
     try:
-        request = context.get("request")
-        if not request:
-            return None
-        session = invoke("get", "session", "", request)
+        session = await get_session(context)
         return session.get("email") if session else None
     except Exception as e:
         logger.warning("Failed to get user from Traccar: %s", e)
@@ -377,34 +518,32 @@ async def show_html(
     ctx: RunContextWrapper[TraccarAgentContext], html: str
 ) -> dict[str, str]:
     try:
-        logger.info("TOOL: show_html")
-        js_error = _validate_js_syntax(html)
+        logger.debug("TOOL: show_html")
+        js_error = await asyncio.to_thread(_validate_js_syntax, html)
         if js_error:
             logger.warning("JS validation failed: %s", js_error)
             return {"error": js_error}
-        email = _get_user_email_from_traccar(ctx.context.request_context)
-        session = _get_session_id(ctx.context.request_context.get("request"))
-        traccar_url = _get_traccar_url(ctx.context.request_context.get("request"))
-        html_url = _save_html_file(html, email, session, traccar_url)
-        await ctx.context.store.save_html_report(email, ctx.context.thread.id, html_url)
+        email = await _get_user_email_from_traccar(ctx.context.request_context)
+        session = _get_session_id(ctx.context.request)
+        traccar_url = _get_traccar_url(ctx.context.request)
+        html_url = await _save_html_file(html, email, session, traccar_url)
         # Take a screenshot via local Playwright headless Chromium
         screenshot_filename = html_url.rsplit("/", 1)[-1].replace(".html", ".png")
         screenshot_path = REPORTS_DIR / screenshot_filename
         screenshot_url = html_url.replace(".html", ".png")
 
         async def _take_screenshot() -> None:
-            import time
             start = time.monotonic()
             try:
-                from playwright.async_api import async_playwright
-                async with async_playwright() as p:
-                    browser = await p.chromium.launch()
-                    page = await browser.new_page(viewport={"width": 1280, "height": 720})
+                browser = await _get_browser()
+                page = await browser.new_page(viewport={"width": 1280, "height": 720})
+                try:
                     await page.goto(html_url, wait_until="networkidle", timeout=90000)
                     await page.screenshot(path=str(screenshot_path), full_page=True, timeout=120000)
-                    await browser.close()
-                    elapsed = time.monotonic() - start
-                    logger.info("Screenshot saved: %s (%.1fs)", screenshot_path, elapsed)
+                finally:
+                    await page.close()
+                elapsed = time.monotonic() - start
+                logger.info("Screenshot saved: %s (%.1fs)", screenshot_path, elapsed)
             except Exception as e:
                 elapsed = time.monotonic() - start
                 logger.warning("Screenshot failed (%.1fs): %s", elapsed, e)
@@ -419,6 +558,11 @@ async def show_html(
             mime_type="image/png",
             preview_url=AnyUrl(screenshot_url),
         )
+        # The report row is history only; the attachment row must exist before the
+        # client sends its id back, so only that one is awaited
+        _run_in_background(
+            ctx.context.store.save_html_report(email, ctx.context.thread.id, html_url)
+        )
         await ctx.context.store.save_attachment(attachment, ctx.context.request_context)
         logger.info("Saved screenshot attachment %s for %s", attachment_id, html_url)
 
@@ -427,16 +571,16 @@ async def show_html(
             arguments={
                 "html": html,
                 "html_url": html_url,
-                "attachment": json.dumps({
+                "attachment": {
                     "id": attachment_id,
                     "type": "image",
                     "name": "screenshot.png",
                     "mime_type": "image/png",
                     "preview_url": screenshot_url,
-                }),
+                },
             },
         )
-        logger.info("show_html success")
+        logger.debug("show_html success")
         return {"result": "success", "url": html_url}
     except Exception:
         logger.exception("show_html failed")
@@ -446,15 +590,14 @@ async def show_html(
 async def forward_to_real_agent(
     ctx: RunContextWrapper[TraccarAgentContext], question: str
 ) -> str:
-    logger.info("forward_to_real_agent")
+    logger.debug("forward_to_real_agent")
     """Send the user's question to support via email."""
-    request = ctx.context.request_context.get("request")
-    session = invoke("get", "session", "", request) if request else None
+    session = await get_session(ctx.context.request_context)
     user_email = session.get("email") if session else "unknown"
     thread_id = ctx.context.thread.id
 
-    ses = boto3.client("ses", region_name="eu-west-1")
-    ses.send_email(
+    await asyncio.to_thread(
+        _send_email,
         Source="support@fleetmap.io",
         Destination={"ToAddresses": ["support@fleetmap.io"]},
         Message={
@@ -470,5 +613,21 @@ async def forward_to_real_agent(
 
 @function_tool(description_override="Open API specification (yaml) for the Traccar server")
 async def get_openapi_yaml() -> str:
-    logger.info("TOOL: get_openapi_yaml")
-    return (Path(__file__).parent / "openapi.yaml").read_text()
+    logger.debug("TOOL: get_openapi_yaml")
+    return _OPENAPI_YAML
+
+
+TOOLS: Final[list[Any]] = [
+    invoke_api,
+    show_html,
+    get_openapi_yaml,
+]
+
+ASSISTANT_AGENT: Final[Agent[TraccarAgentContext]] = Agent[TraccarAgentContext](
+    model=MODEL,
+    name="Traccar Assistant",
+    instructions=INSTRUCTIONS,
+    tools=cast(Any, TOOLS),
+    # Independent API lookups in one turn run concurrently as SDK tool tasks
+    model_settings=ModelSettings(parallel_tool_calls=True),
+)
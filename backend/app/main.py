@@ -2,26 +2,48 @@
 
 from __future__ import annotations
 
+import asyncio
+import gc
 import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterable, AsyncIterator
 
-import httpx
 from chatkit.server import StreamingResult
 from fastapi import Depends, FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, Response, StreamingResponse
 from starlette.responses import JSONResponse
-
-logger = logging.getLogger(__name__)
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from .chat import (
     REPORTS_DIR,
     TraccarAssistantServer,
+    close_browser,
     create_chatkit_server,
+    drain_background_tasks,
     screenshot_tasks,
 )
-from .traccar import _get_cookie, _get_traccar_url
+from .neon_store import close_pool
+from .traccar import _client as _traccar_client
+from .traccar import _get_cookie, _get_traccar_url, close_client
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+logger = logging.getLogger(__name__)
 
-app = FastAPI(title="ChatKit API")
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    # Everything imported so far (SDK modules, schemas, the spec text) lives for the
+    # whole process, so keep it out of every future full collection
+    gc.freeze()
+    yield
+    await drain_background_tasks()
+    await close_browser()
+    await close_client()
+    await close_pool()
+
+
+app = FastAPI(title="ChatKit API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -41,11 +63,25 @@ def _real_ip(request: Request) -> str:
     return request.headers.get("CF-Connecting-IP") or (request.client.host if request.client else "unknown")
 
 
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    ip = _real_ip(request)
-    logger.info("%s %s %s %s", ip, request.method, request.url.path, request.headers.get('cf-ipcountry'))
-    return await call_next(request)
+class RequestLogMiddleware:
+    """Log each HTTP request as plain ASGI middleware.
+
+    Unlike @app.middleware("http"), this doesn't route every response (the
+    streamed chat included) through BaseHTTPMiddleware's extra task and stream.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            request = Request(scope)
+            ip = _real_ip(request)
+            logger.info("%s %s %s %s", ip, request.method, request.url.path, request.headers.get('cf-ipcountry'))
+        await self.app(scope, receive, send)
+
+
+app.add_middleware(RequestLogMiddleware)
 
 
 def get_chatkit_server() -> TraccarAssistantServer:
@@ -77,13 +113,12 @@ async def proxy_traccar(request: Request, path: str) -> Response:
 
     body = await request.body()
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.request(
-            request.method,
-            traccar_url,
-            headers=headers,
-            content=body or None,
-        )
+    resp = await _traccar_client.request(
+        request.method,
+        traccar_url,
+        headers=headers,
+        content=body or None,
+    )
 
     excluded = {"transfer-encoding", "content-encoding", "content-length"}
     resp_headers = {
@@ -109,10 +144,8 @@ async def get_file(filename: str) -> Response:
 
     # Determine media type based on file extension
     if filename.endswith(".html"):
-        # Serve HTML directly in browser
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-        return Response(content=content, media_type="text/html")
+        # Serve HTML directly in browser, streamed from disk in chunks
+        return FileResponse(path=file_path, media_type="text/html")
     elif filename.endswith(".png"):
         return FileResponse(path=file_path, media_type="image/png")
     else:
@@ -120,6 +153,41 @@ async def get_file(filename: str) -> Response:
         return FileResponse(path=file_path, media_type="application/json", filename=filename)
 
 
+async def _coalesce_stream(stream: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Drive the ChatKit stream in one task and flush whatever has queued up as a single chunk.
+
+    Events that arrive in a burst (e.g. several text deltas from one network read)
+    go out in one write instead of one per event, without delaying a lone event.
+    """
+    queue: asyncio.Queue[bytes | Exception | None] = asyncio.Queue()
+
+    async def produce() -> None:
+        try:
+            async for chunk in stream:
+                await queue.put(chunk)
+        except Exception as e:
+            await queue.put(e)
+        else:
+            await queue.put(None)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            batch = [await queue.get()]
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            chunks = [entry for entry in batch if isinstance(entry, bytes)]
+            if chunks:
+                yield b"".join(chunks)
+            last = batch[-1]
+            if last is None:
+                return
+            if isinstance(last, Exception):
+                raise last
+    finally:
+        producer.cancel()
+
+
 @app.post("/chatkit")
 async def chatkit_endpoint(
     request: Request, server: TraccarAssistantServer = Depends(get_chatkit_server)
@@ -127,7 +195,7 @@ async def chatkit_endpoint(
     payload = await request.body()
     result = await server.process(payload, {"request": request})
     if isinstance(result, StreamingResult):
-        return StreamingResponse(result, media_type="text/event-stream")
+        return StreamingResponse(_coalesce_stream(result), media_type="text/event-stream")
     if hasattr(result, "json"):
         return Response(content=result.json, media_type="application/json")
     return JSONResponse(result)
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import logging
 import os
 from dataclasses import dataclass
 from datetime import datetime, timezone
@@ -27,7 +29,9 @@ from chatkit.types import (
 from psycopg_pool import AsyncConnectionPool
 from pydantic import TypeAdapter
 
-from .traccar import invoke
+from .traccar import get_session
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -37,17 +41,66 @@ class _ThreadState:
 
 
 _pool: AsyncConnectionPool | None = None
+_read_pool: AsyncConnectionPool | None = None
+_pool_lock = asyncio.Lock()
+
+
+async def _open_pool(conninfo: str) -> AsyncConnectionPool:
+    pool = AsyncConnectionPool(
+        conninfo=conninfo,
+        min_size=1,
+        max_size=10,
+        max_idle=10.0,
+        # Each store call is a single statement; skip the implicit BEGIN/COMMIT
+        # round-trips and open explicit transactions where atomicity matters.
+        kwargs={"autocommit": True},
+        open=False,
+        check=AsyncConnectionPool.check_connection,
+    )
+    await pool.open()
+    return pool
 
 
 async def _get_pool() -> AsyncConnectionPool:
     global _pool
-    if _pool is None:
-        conninfo = os.environ["DATABASE_URL"]
-        _pool = AsyncConnectionPool(conninfo=conninfo, min_size=1, max_size=10, open=False, check=AsyncConnectionPool.check_connection)
-        await _pool.open()
+    if _pool is not None:
+        return _pool
+    # Concurrent first requests must not each open their own pool
+    async with _pool_lock:
+        if _pool is None:
+            _pool = await _open_pool(os.environ["DATABASE_URL"])
     return _pool
 
 
+async def _get_read_pool() -> AsyncConnectionPool:
+    """Pool for the thread list: a Neon read replica if DATABASE_READ_URL is set, else the primary.
+
+    Only reads that tolerate replica lag belong here. Thread items stay on the primary:
+    ChatKit rereads them right after writing, e.g. to find a pending client tool call.
+    """
+    global _read_pool
+    conninfo = os.environ.get("DATABASE_READ_URL")
+    if not conninfo:
+        return await _get_pool()
+    if _read_pool is not None:
+        return _read_pool
+    async with _pool_lock:
+        if _read_pool is None:
+            _read_pool = await _open_pool(conninfo)
+    return _read_pool
+
+
+async def close_pool() -> None:
+    """Close the shared connection pools, if they were ever opened."""
+    global _pool, _read_pool
+    if _read_pool is not None:
+        await _read_pool.close()
+        _read_pool = None
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
 class NeonStore(Store[dict[str, Any]]):
     """Neon Postgres-backed persistent store compatible with the ChatKit server interface."""
 
@@ -114,16 +167,13 @@ class NeonStore(Store[dict[str, Any]]):
             """)
         self._initialized = True
 
-    def _get_user_email_from_traccar(self, context: dict[str, Any]) -> str | None:
+    async def _get_user_email_from_traccar(self, context: dict[str, Any]) -> str | None:
         """Get user email from Traccar session."""
         try:
-            request = context.get("request")
-            if not request:
-                return None
-            session = invoke("get", "session", "", request)
+            session = await get_session(context)
             return session.get("email") if session else None
         except Exception as e:
-            print(f"Failed to get user from Traccar: {e}")
+            logger.warning("Failed to get user from Traccar: %s", e)
             return None
 
     def _deserialize_thread_item(self, data: Dict[str, Any]) -> ThreadItem:
@@ -175,7 +225,7 @@ class NeonStore(Store[dict[str, Any]]):
         thread_json = json.dumps(thread_dict, default=str)
         created_at = thread.created_at or datetime.now(timezone.utc)
         updated_at = datetime.now(timezone.utc)
-        user_email = self._get_user_email_from_traccar(context)
+        user_email = await self._get_user_email_from_traccar(context)
 
         async with pool.connection() as conn:
             await conn.execute(
@@ -198,12 +248,12 @@ class NeonStore(Store[dict[str, Any]]):
         context: dict[str, Any],
     ) -> Page[ThreadMetadata]:
         await self._ensure_schema()
-        user_email = self._get_user_email_from_traccar(context)
+        user_email = await self._get_user_email_from_traccar(context)
 
         if not user_email:
             return Page(data=[], has_more=False, after=None)
 
-        pool = await _get_pool()
+        pool = await _get_read_pool()
         async with pool.connection() as conn:
             cur = await conn.execute(
                 "SELECT id, data FROM threads WHERE user_id = %s", (user_email,)
@@ -241,7 +291,7 @@ class NeonStore(Store[dict[str, Any]]):
     async def delete_thread(self, thread_id: str, context: dict[str, Any]) -> None:
         await self._ensure_schema()
         pool = await _get_pool()
-        async with pool.connection() as conn:
+        async with pool.connection() as conn, conn.transaction():
             await conn.execute("DELETE FROM thread_items WHERE thread_id = %s", (thread_id,))
             await conn.execute("DELETE FROM threads WHERE id = %s", (thread_id,))
 
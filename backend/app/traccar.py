@@ -1,24 +1,45 @@
+import hashlib
 import logging
+import time
+from http.cookiejar import CookieJar, DefaultCookiePolicy
 
-import requests
+import httpx
+import orjson
 
 logger = logging.getLogger(__name__)
 fleetmap_url = "https://api.pinme.io"
+# Shared across calls so Traccar connections are pooled and kept alive. It serves
+# every user, so it must never remember a session cookie from a response.
+# HTTPS hosts that offer HTTP/2 multiplex parallel tool calls on one connection.
+_client = httpx.AsyncClient(
+    http2=True,
+    timeout=httpx.Timeout(120.0, connect=10.0),
+    limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+    cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+)
+
+async def close_client():
+    """Close the shared Traccar HTTP client."""
+    await _client.aclose()
+
+
+_FLEETMAP_ORIGINS = (
+    "https://moviflotte.com",
+    "https://localizalia.net",
+    "https://web.fleetrack.cl",
+    "https://nogartel.fleetmap.io",
+    "https://fleetmap.io",
+    "https://plataforma.puntosat.cl",
+    "https://afconsultingsystems.com",
+    "https://plataforma.ubisat.cl",
+)
+
 
 def _get_traccar_url(request):
     origin = request.headers.get("origin") if request and hasattr(request, "headers") else None
-    logger.info("Request origin: %s", origin)
-    fleetmap_origins = [
-        "https://moviflotte.com",
-        "https://localizalia.net",
-        "https://web.fleetrack.cl",
-        "https://nogartel.fleetmap.io",
-        "https://fleetmap.io",
-        "https://plataforma.puntosat.cl",
-        "https://afconsultingsystems.com",
-        "https://plataforma.ubisat.cl"
-    ]
-    if origin and any(origin.startswith(domain) for domain in fleetmap_origins):
+    logger.debug("Request origin: %s", origin)
+    # A tuple lets str.startswith test every origin in one call
+    if origin and origin.startswith(_FLEETMAP_ORIGINS):
         return fleetmap_url
     hostname = request.headers.get("host", "") if request and hasattr(request, "headers") else ""
     if "i8ttracker.com.br" in hostname:
@@ -59,12 +80,12 @@ def _get_cookie(request):
     if session:
         return f"JSESSIONID={session}"
     return None
-def invoke(method, path, body, request):
+async def invoke(method, path, body, request):
     """Generic API invocation with an arbitrary JSON body string."""
-    import json as json_module
-
     cookie = _get_cookie(request)
-    headers = {"Cookie": cookie, "Accept": "application/json"}
+    headers = {"Accept": "application/json"}
+    if cookie:
+        headers["Cookie"] = cookie
     if method.upper() in ("POST", "PUT"):
         headers["Content-Type"] = "application/json"
 
@@ -72,7 +93,84 @@ def invoke(method, path, body, request):
 
     logger.info("%s %s %s", method.upper(), url, body)
 
-    parsed_body = json_module.loads(body) if body else None
-    response = requests.request(method.upper(), url, headers=headers, json=parsed_body)
+    content = None
+    if body:
+        # Reject malformed JSON here, but forward the model's string as-is
+        orjson.loads(body)
+        content = body.encode("utf-8")
+        headers["Content-Type"] = "application/json"
+    response = await _client.request(method.upper(), url, headers=headers, content=content)
     response.raise_for_status()
-    return response.json()
+    return orjson.loads(response.content)
+
+
+_SESSION_CACHE_KEY = "_traccar_session"
+# Sessions by (cookie hash, Traccar URL), shared across requests: every ChatKit call
+# needs the user's email, and it doesn't change within a session. Only a digest of
+# the cookie is kept, so live session ids don't sit in process memory.
+_SESSION_TTL = 30.0
+_SESSION_CACHE_MAX = 4096
+_sessions: dict[tuple[bytes, str], tuple[float, dict]] = {}
+
+
+async def _fetch_session(request):
+    cookie = _get_cookie(request)
+    if not cookie:
+        return await invoke("get", "session", "", request)
+    key = (hashlib.blake2b(cookie.encode(), digest_size=16).digest(), _get_traccar_url(request))
+    now = time.monotonic()
+    hit = _sessions.get(key)
+    if hit is not None and hit[0] > now:
+        return hit[1]
+    session = await invoke("get", "session", "", request)
+    if len(_sessions) >= _SESSION_CACHE_MAX:
+        for stale in [k for k, (expires, _) in _sessions.items() if expires <= now]:
+            del _sessions[stale]
+        if len(_sessions) >= _SESSION_CACHE_MAX:
+            _sessions.clear()
+    _sessions[key] = (now + _SESSION_TTL, session)
+    return session
+
+
+async def get_session(context):
+    """Return the Traccar session for a request context, fetching it at most once per request.
+
+    Across requests the same cookie reuses its session for up to _SESSION_TTL seconds.
+    The trade-off: a JSESSIONID invalidated by logout keeps resolving to its user's
+    email, and so to their thread list, until its entry expires.
+    """
+    if _SESSION_CACHE_KEY not in context:
+        request = context.get("request")
+        context[_SESSION_CACHE_KEY] = await _fetch_session(request) if request else None
+    return context[_SESSION_CACHE_KEY]
+
+
+_RESPONSE_CACHE_KEY = "_traccar_cache"
+_CACHE_GENERATION_KEY = "_traccar_cache_generation"
+
+
+async def invoke_cached(method, path, body, context):
+    """invoke() for a request context, reusing GET results within the same request.
+
+    Any other method clears the cache, since a write may change what later reads return.
+    Writes also bump a generation, so a GET that was in flight across a write doesn't
+    store its possibly pre-write result.
+    """
+    cache = context.setdefault(_RESPONSE_CACHE_KEY, {})
+    request = context.get("request")
+    if method.upper() != "GET":
+        context[_CACHE_GENERATION_KEY] = context.get(_CACHE_GENERATION_KEY, 0) + 1
+        cache.clear()
+        try:
+            return await invoke(method, path, body, request)
+        finally:
+            context[_CACHE_GENERATION_KEY] += 1
+            cache.clear()
+    key = (path.lstrip("/"), body)
+    if key in cache:
+        return cache[key]
+    generation = context.get(_CACHE_GENERATION_KEY, 0)
+    result = await invoke(method, path, body, request)
+    if context.get(_CACHE_GENERATION_KEY, 0) == generation:
+        cache[key] = result
+    return result